@@ -15,6 +15,15 @@ if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
     sys.stderr.reconfigure(encoding='utf-8')
 
+# 书签条目格式: "1.章节标题(第X页)" 或 "1.1 章节标题(第X页)"
+# 主章节: 索引后直接跟标题，如 "1.入门篇(第3页)"
+# 子章节: 索引后有空格再跟标题，如 "1.1 导论(第4页)"
+_SUB_CHAPTER_RE = re.compile(r'^(\d+(?:\.\d+)+)\s+(.+?)\s*\(第(\d+)页\)$')
+_MAIN_CHAPTER_RE = re.compile(r'^(\d+)\.(.+?)\s*\(第(\d+)页\)$')
+
+# 保存PDF时的写缓冲大小
+OUTPUT_BUFFER_SIZE = 1 << 20
+
 
 def parse_bookmarks(bookmarks_file):
     """解析书签文件，提取文档标题和章节书签"""
@@ -52,14 +61,9 @@ def parse_bookmarks(bookmarks_file):
                 indent_level = leading_spaces // 4
             
             # 匹配书签条目
-            # 格式: "1.章节标题(第X页)" 或 "1.1 章节标题(第X页)"
-            # 主章节: 索引后直接跟标题，如 "1.入门篇(第3页)"
-            # 子章节: 索引后有空格再跟标题，如 "1.1 导论(第4页)"
-            sub_chapter_pattern = r'^(\d+(?:\.\d+)+)\s+(.+?)\s*\(第(\d+)页\)$'
-            main_chapter_pattern = r'^(\d+)\.(.+?)\s*\(第(\d+)页\)$'
-            
-            sub_match = re.match(sub_chapter_pattern, line.lstrip())
-            main_match = re.match(main_chapter_pattern, line.lstrip())
+            stripped = line.lstrip()
+            sub_match = _SUB_CHAPTER_RE.match(stripped)
+            main_match = _MAIN_CHAPTER_RE.match(stripped)
             
             if sub_match or main_match:
                 index, title, page_num = (sub_match or main_match).groups()
@@ -79,6 +83,14 @@ def parse_bookmarks(bookmarks_file):
     return bookmarks, doc_title
 
 
+def _flush_logs(logs):
+    """一次性输出缓存的日志并清空缓存"""
+    if logs:
+        sys.stdout.write('\n'.join(logs) + '\n')
+        sys.stdout.flush()
+        logs.clear()
+
+
 def add_bookmarks_to_pdf(pdf_file, bookmarks, doc_title, output_file=None):
     """将书签添加到PDF文件"""
     if not os.path.exists(pdf_file):
@@ -89,41 +101,45 @@ def add_bookmarks_to_pdf(pdf_file, bookmarks, doc_title, output_file=None):
         print("[错误] 没有书签信息")
         return False
     
+    logs = []
     try:
         # 读取PDF文件
         print(f"[信息] 正在读取PDF文件: {pdf_file}")
         reader = PdfReader(pdf_file)
         writer = PdfWriter()
         
-        # 复制所有页面
-        for page in reader.pages:
-            writer.add_page(page)
+        # 一次性复制所有页面
+        writer.append_pages_from_reader(reader)
         
         # 添加封面和目录书签
         print("[信息] 正在添加书签...")
         
+        # 逐条书签的输出先缓存，添加完成后一次性写出
+        log = logs.append
+        
         # 添加封面书签 (第1页)
         writer.add_outline_item(
             title="封面",
             page_number=0
         )
-        print("  [成功] 封面 -> 第1页")
+        log("  [成功] 封面 -> 第1页")
         
         # 添加目录书签 (第2页)
         writer.add_outline_item(
             title="目录",
             page_number=1
         )
-        print("  [成功] 目录 -> 第2页")
+        log("  [成功] 目录 -> 第2页")
         
         # 添加章节书签（支持多层级）
         # 用于跟踪父书签的字典，key为层级，value为父书签对象
         parent_bookmarks = {}
+        num_pages = len(reader.pages)
         
         for bookmark in bookmarks:
             # PyPDF2中页码从0开始，所以需要减1
             page_index = bookmark['page'] - 1
-            if 0 <= page_index < len(reader.pages):
+            if 0 <= page_index < num_pages:
                 # 根据层级添加书签
                 if bookmark['level'] == 0:
                     # 顶级书签
@@ -132,7 +148,7 @@ def add_bookmarks_to_pdf(pdf_file, bookmarks, doc_title, output_file=None):
                         page_number=page_index
                     )
                     parent_bookmarks[0] = parent
-                    print(f"  [成功] {bookmark['index']} {bookmark['title']} -> 第{bookmark['page']}页")
+                    log(f"  [成功] {bookmark['index']} {bookmark['title']} -> 第{bookmark['page']}页")
                 else:
                     # 子级书签，需要找到父书签
                     # 查找最近的父层级（小于当前层级的最大层级）
@@ -150,7 +166,7 @@ def add_bookmarks_to_pdf(pdf_file, bookmarks, doc_title, output_file=None):
                             parent=parent
                         )
                         parent_bookmarks[bookmark['level']] = child
-                        print(f"    [成功] {bookmark['index']} {bookmark['title']} -> 第{bookmark['page']}页")
+                        log(f"    [成功] {bookmark['index']} {bookmark['title']} -> 第{bookmark['page']}页")
                     else:
                         # 如果找不到父书签，则作为顶级书签添加
                         parent = writer.add_outline_item(
@@ -158,9 +174,11 @@ def add_bookmarks_to_pdf(pdf_file, bookmarks, doc_title, output_file=None):
                             page_number=page_index
                         )
                         parent_bookmarks[bookmark['level']] = parent
-                        print(f"    [成功] {bookmark['index']} {bookmark['title']} -> 第{bookmark['page']}页 (作为顶级书签)")
+                        log(f"    [成功] {bookmark['index']} {bookmark['title']} -> 第{bookmark['page']}页 (作为顶级书签)")
             else:
-                print(f"  [警告] 页码超出范围: {bookmark['title']} -> 第{bookmark['page']}页")
+                log(f"  [警告] 页码超出范围: {bookmark['title']} -> 第{bookmark['page']}页")
+        
+        _flush_logs(logs)
         
         # 注意：已移除默认视图属性设置，避免PyPDF2版本兼容性问题
         print("  [信息] 已跳过默认视图属性设置（PyPDF2版本兼容性考虑）")
@@ -172,13 +190,15 @@ def add_bookmarks_to_pdf(pdf_file, bookmarks, doc_title, output_file=None):
         
         # 保存带书签的PDF
         print(f"[信息] 正在保存带书签的PDF: {output_file}")
-        with open(output_file, 'wb') as output:
+        # 使用1 MiB写缓冲，合并PyPDF2的大量小块写入
+        with open(output_file, 'wb', buffering=OUTPUT_BUFFER_SIZE) as output:
             writer.write(output)
         
         print(f"[成功] 书签添加成功！输出文件: {output_file}")
         return True
         
     except Exception as e:
+        _flush_logs(logs)
         print(f"[错误] 添加书签失败: {e}")
         return False
 
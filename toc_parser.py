@@ -5,24 +5,120 @@
 从index.html中解析多级目录结构，支持嵌套的章节和子章节
 """
 
+import codecs
+import copy
+import functools
+import io
 import os
+import posixpath
 import re
 import sys
-from typing import List, Dict, Any
+from dataclasses import dataclass, asdict
+from html.parser import HTMLParser
+from operator import attrgetter
+from typing import List, Dict, Any, Iterator, Tuple, Union
 from pathlib import Path
 from bs4 import BeautifulSoup
 
+# 优先使用C实现的lxml解析器，未安装时回退到内置的html.parser
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# 清理文档标题中的后缀
+_TITLE_SUFFIX_RE = re.compile(r'\s*[-|]\s*.*$')  # " - 作者名"、" | 网站名"等后缀
+
+# 提取文档标题时每次读取的字节数
+TITLE_READ_CHUNK = 4096
+
+# parse_from_file的解析结果缓存，键为(解析器类型, 绝对路径, 修改时间)
+PARSE_CACHE_SIZE = 32
+_PARSE_CACHE: Dict[Tuple[type, str, int], Dict[str, Any]] = {}
+
+# 书签缩进（每层4个空格），按层级预先生成
+_INDENTS = tuple('    ' * i for i in range(16))
+
+
+def _indent(level: int) -> str:
+    """
+    返回指定层级的书签缩进
+    """
+    return _INDENTS[level] if level < len(_INDENTS) else '    ' * level
+
+
+@dataclass(slots=True)
+class TOCEntry:
+    """
+    扁平化目录中的一个条目
+    """
+    href: str
+    title: str
+    level: int
+    index: int
+    display_index: str
+    has_children: bool
+
+
+class _TitleFinder(HTMLParser):
+    """
+    流式查找文档标题：记录首个<title>、<h1>和<meta name="title">，
+    找到非空的<title>后即标记完成，调用方不必再读取剩余内容
+    """
+    def __init__(self):
+        super().__init__()
+        self.title = None
+        self.h1 = None
+        self.meta_title = None
+        self.done = False
+        self._capture = None  # 正在收集文本的标签
+        self._buffer = []
+    
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == 'meta':
+            attrs = dict(attrs)
+            if self.meta_title is None and (attrs.get('name') or '').lower() == 'title':
+                self.meta_title = (attrs.get('content') or '').strip()
+        elif (tag == 'title' and self.title is None) or (tag == 'h1' and self.h1 is None):
+            self._capture = tag
+            self._buffer = []
+    
+    def handle_endtag(self, tag):
+        if self.done or tag != self._capture:
+            return
+        text = ''.join(self._buffer).strip()
+        self._capture = None
+        if tag == 'title':
+            # 清理标题中的多余内容
+            self.title = _TITLE_SUFFIX_RE.sub('', text)  # 移除" - 作者名"、" | 网站名"等后缀
+            self.done = bool(self.title)
+        else:
+            self.h1 = text
+    
+    def handle_data(self, data):
+        if self._capture and not self.done:
+            self._buffer.append(data)
+    
+    def result(self) -> str:
+        """
+        按<title>、<h1>、<meta>的优先级返回标题
+        """
+        return self.title or self.h1 or self.meta_title or "文档"
+
 
 class TOCParser:
     def __init__(self):
         pass
     
-    def parse_toc(self, html_content: str) -> Dict[str, Any]:
+    def parse_toc(self, html_content: Union[str, bytes]) -> Dict[str, Any]:
         """
         解析HTML内容，提取多级目录结构
         """
         # 使用BeautifulSoup解析HTML
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = BeautifulSoup(html_content, HTML_PARSER)
         
         # 找到菜单容器
         menu_container = soup.find('aside', class_='menu')
@@ -37,11 +133,9 @@ class TOCParser:
         if not main_ul:
             raise ValueError('无法找到目录列表')
         
-        # 解析层级结构
-        hierarchical_toc = self._parse_hierarchical_structure(main_ul)
-        
-        # 扁平化结构
-        flat_toc = self._flatten_hierarchy(hierarchical_toc)
+        # 单次遍历同时生成层级结构和扁平化结构
+        flat_toc = []
+        hierarchical_toc = self._parse_hierarchical_structure(main_ul, flat_toc)
         
         return {
             'hierarchical': hierarchical_toc,
@@ -49,14 +143,15 @@ class TOCParser:
             'total_items': len(flat_toc)
         }
     
-    def _parse_hierarchical_structure(self, main_ul) -> List[Dict[str, Any]]:
+    def _parse_hierarchical_structure(self, main_ul, flat_out: List[TOCEntry], prefix: Tuple[int, ...] = ()) -> List[Dict[str, Any]]:
         """
         解析层级结构
+        同时按先序把条目追加到flat_out，生成连续的索引和形如 "2.1.3" 的显示序号
         """
         items = []
         
         # 解析主列表中的li项
-        for li in main_ul.find_all('li', recursive=False):
+        for li in (child for child in main_ul.children if child.name == 'li'):
             # 查找a标签
             a_tag = li.find('a', href=True)
             if a_tag and a_tag['href'].endswith('.html'):
@@ -66,17 +161,29 @@ class TOCParser:
                 title_span = a_tag.find('span', class_='menu-list-title')
                 if title_span:
                     title = title_span.get_text().strip()
+                    path = prefix + (len(items) + 1,)
+                    
+                    flat_item = TOCEntry(
+                        href=href,
+                        title=title,
+                        level=len(path),
+                        index=len(flat_out) + 1,
+                        display_index='.'.join(map(str, path)),
+                        has_children=False
+                    )
+                    flat_out.append(flat_item)
                     
                     # 检查是否包含子ul
                     children = []
                     sub_ul = li.find('ul')
                     if sub_ul:
-                        children = self._parse_hierarchical_structure(sub_ul)
+                        children = self._parse_hierarchical_structure(sub_ul, flat_out, path)
+                    flat_item.has_children = len(children) > 0
                     
                     item = {
                         'href': href,
                         'title': title,
-                        'level': 1,
+                        'level': len(path),
                         'children': children,
                         'is_folder': len(children) > 0
                     }
@@ -84,65 +191,40 @@ class TOCParser:
         
         return items
     
-    def _flatten_hierarchy(self, hierarchical: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """
-        将层级结构扁平化，生成连续的索引
-        """
-        flat = []
-        index_counter = 1
-        
-        def flatten_items(items, level=1):
-            nonlocal index_counter
-            
-            for item in items:
-                # 为当前项生成索引
-                display_index = str(index_counter)
-                flat_item = {
-                    'href': item['href'],
-                    'title': item['title'],
-                    'level': item['level'],
-                    'index': len(flat) + 1,
-                    'display_index': display_index,
-                    'has_children': len(item['children']) > 0
-                }
-                flat.append(flat_item)
-                
-                # 处理子项目
-                if item['children']:
-                    # 为每个子项目生成带前缀的索引
-                    for i, child in enumerate(item['children']):
-                        child_display_index = f"{display_index}.{i + 1}"
-                        flat_child = {
-                            'href': child['href'],
-                            'title': child['title'],
-                            'level': child['level'],
-                            'index': len(flat) + 1,
-                            'display_index': child_display_index,
-                            'has_children': False
-                        }
-                        flat.append(flat_child)
-                
-                index_counter += 1
-        
-        flatten_items(hierarchical)
-        return flat
-    
-    def validate_toc_files(self, flat_toc: List[Dict[str, Any]], src_dir: str) -> Dict[str, Any]:
+    def validate_toc_files(self, flat_toc: List[TOCEntry], src_dir: str) -> Dict[str, Any]:
         """
         验证目录文件是否存在
+        valid_files和missing_files中的条目均为字典，缺失条目额外带有file_path
         """
         valid_files = []
         missing_files = []
         
         src_path = Path(src_dir)
         
+        # 每个被引用的目录只列举一次，避免逐条目检查文件是否存在
+        dir_listings = {}
+        
         for item in flat_toc:
-            file_path = src_path / item['href']
+            # 规范化"./basic.html"等写法后再按目录查找
+            dir_name, file_name = posixpath.split(posixpath.normpath(item.href))
+            if dir_name not in dir_listings:
+                try:
+                    with os.scandir(os.path.join(src_dir, dir_name)) as entries:
+                        dir_listings[dir_name] = {entry.name for entry in entries}
+                except OSError:
+                    dir_listings[dir_name] = set()
+            
+            if file_name in dir_listings[dir_name]:
+                valid_files.append(asdict(item))
+                continue
+            
+            # 未命中时再按路径检查（如大小写不敏感的文件系统）
+            file_path = src_path / item.href
             if file_path.exists():
-                valid_files.append(item)
+                valid_files.append(asdict(item))
             else:
                 missing_files.append({
-                    **item,
+                    **asdict(item),
                     'file_path': str(file_path)
                 })
         
@@ -153,7 +235,7 @@ class TOCParser:
             'total_missing': len(missing_files)
         }
     
-    def generate_bookmark_text(self, flat_toc: List[Dict[str, Any]], doc_title: str, total_pages: int = 0) -> str:
+    def generate_bookmark_text(self, flat_toc: List[TOCEntry], doc_title: str, total_pages: int = 0) -> str:
         """
         生成书签文本（按照模板格式）
         """
@@ -161,117 +243,79 @@ class TOCParser:
         
         for item in flat_toc:
             # 根据层级添加缩进（模板使用4个空格的缩进）
-            if item['level'] == 1:
+            if item.level == 1:
                 indent = ''
             else:
-                indent = '    ' * (item['level'] - 1)
+                indent = '    ' * (item.level - 1)
             
             # 构建书签条目，格式：序号.标题(第X页)
             # 注意：这里页码是预估的，实际页码需要在PDF生成后确定
-            estimated_page = 3 + item['index'] - 1  # 从第3页开始（封面+目录）
-            bookmark_line = f"{indent}{item['display_index']}.{item['title']}(第{estimated_page}页)"
+            estimated_page = 3 + item.index - 1  # 从第3页开始（封面+目录）
+            bookmark_line = f"{indent}{item.display_index}.{item.title}(第{estimated_page}页)"
             bookmark_lines.append(bookmark_line)
         
-        return f"{doc_title}目录：\n\n{chr(10).join(bookmark_lines)}\n\n总页数：{total_pages}"
+        return f"{doc_title}目录：\n\n" + '\n'.join(bookmark_lines) + f"\n\n总页数：{total_pages}"
     
-    def generate_pdf_bookmarks(self, flat_toc: List[Dict[str, Any]], start_page: int = 3) -> List[Dict[str, Any]]:
+    def generate_pdf_bookmarks(self, flat_toc: List[TOCEntry], start_page: int = 3) -> List[Dict[str, Any]]:
         """
         生成PDF书签数据
         """
-        bookmarks = []
-        
-        for item in flat_toc:
-            bookmark = {
-                'title': item['title'],
-                'level': item['level'],
-                'page_index': start_page + item['index'] - 1,
-                'display_index': item['display_index']
+        return [
+            {
+                'title': item.title,
+                'level': item.level,
+                'page_index': start_page + item.index - 1,
+                'display_index': item.display_index
             }
-            bookmarks.append(bookmark)
-        
-        return bookmarks
+            for item in flat_toc
+        ]
     
-    def generate_bookmarks_file(self, flat_toc: List[Dict[str, Any]], doc_title: str, output_file: str = 'output/bookmarks.txt', page_map: Dict[str, int] = None) -> str:
+    def generate_bookmarks_file(self, flat_toc: List[TOCEntry], doc_title: str, output_file: str = 'output/bookmarks.txt', page_map: Dict[str, int] = None) -> str:
         """
         生成符合模板格式的bookmarks.txt文件
         """
-        bookmark_lines = []
+        page_map = page_map or {}
         
-        for item in flat_toc:
-            # 根据display_index的层级添加缩进（模板使用4个空格的缩进）
-            if '.' in item['display_index']:
-                # 子章节，根据点的数量确定缩进
-                level = item['display_index'].count('.')
-                indent = '    ' * level
-            else:
-                # 主章节，无缩进
-                indent = ''
-            
-            # 使用实际页码或预估页码
-            actual_page = None
-            if page_map and item['title'] in page_map:
-                # PDF页码从0开始，但书签显示从1开始
-                actual_page = page_map[item['title']] + 1
-            else:
-                # 构建书签条目，严格按照模板格式
-                # 主章节：序号.标题(第X页)  子章节：序号 标题(第X页)
-                # 注意：这里页码是预估的，实际页码需要在PDF生成后确定
-                actual_page = 2 + item['index']  # 从第3页开始（封面+目录）
-            
-            # 判断是否为主章节（不包含点的序号）
-            if '.' not in item['display_index']:
-                # 主章节，序号和标题之间用点
-                bookmark_line = f"{indent}{item['display_index']}.{item['title']}(第{actual_page}页)"
-            else:
-                # 子章节，序号和标题之间用空格
-                bookmark_line = f"{indent}{item['display_index']} {item['title']}(第{actual_page}页)"
-            bookmark_lines.append(bookmark_line)
+        bookmark_lines = [self._bookmark_line(item, page_map) for item in flat_toc]
         
         # 生成完整的书签文本，严格按照模板格式：只有书签条目，没有标题和总页数
-        bookmark_text = chr(10).join(bookmark_lines)
+        bookmark_text = '\n'.join(bookmark_lines)
         
         # 确保输出目录存在
         output_dir = os.path.dirname(output_file)
         if output_dir:  # 只有当目录不为空时才创建
             os.makedirs(output_dir, exist_ok=True)
         
-        # 写入文件
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(bookmark_text)
+        # 写入文件（UTF-8无BOM，保持\n换行，不做平台换行转换）
+        Path(output_file).write_bytes(bookmark_text.encode('utf-8'))
         
         return output_file
     
+    @staticmethod
+    def _bookmark_line(item: TOCEntry, page_map: Dict[str, int]) -> str:
+        """
+        生成单条书签
+        主章节：序号.标题(第X页)  子章节：序号 标题(第X页)
+        """
+        # 根据display_index的层级添加缩进（模板使用4个空格的缩进）
+        dots = item.display_index.count('.')
+        separator = '.' if dots == 0 else ' '
+        
+        # 使用实际页码或预估页码
+        # PDF页码从0开始，但书签显示从1开始；无映射时从第3页开始预估（封面+目录）
+        page_index = page_map.get(item.title)
+        actual_page = page_index + 1 if page_index is not None else 2 + item.index
+        
+        return f"{_indent(dots)}{item.display_index}{separator}{item.title}(第{actual_page}页)"
+    
     def extract_document_title(self, html_file_path: str) -> str:
         """
         从HTML文件中提取文档标题
         """
         try:
-            with open(html_file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # 尝试从<title>标签提取
-            title_match = re.search(r'<title[^>]*>(.*?)</title>', content, re.IGNORECASE)
-            if title_match:
-                title = title_match.group(1).strip()
-                # 清理标题中的多余内容
-                title = re.sub(r'\s*-\s*.*$', '', title)  # 移除" - 作者名"等后缀
-                title = re.sub(r'\s*\|\s*.*$', '', title)  # 移除" | 网站名"等后缀
-                if title:
-                    return title
-            
-            # 尝试从<h1>标签提取
-            h1_match = re.search(r'<h1[^>]*>(.*?)</h1>', content, re.IGNORECASE)
-            if h1_match:
-                return h1_match.group(1).strip()
-            
-            # 尝试从<meta>标签提取
-            meta_title_match = re.search(r'<meta[^>]*name=["\']title["\'][^>]*content=["\']([^"\']*)["\']',
-                                          content, re.IGNORECASE)
-            if meta_title_match:
-                return meta_title_match.group(1).strip()
-            
-            # 返回默认标题
-            return "文档"
+            # 结果按(路径, 修改时间)缓存，文件未变化时不再重复读取
+            mtime_ns = os.stat(html_file_path).st_mtime_ns
+            return _extract_title_cached(os.path.abspath(html_file_path), mtime_ns)
             
         except Exception as e:
             print(f"[WARNING] 提取文档标题失败: {e}")
@@ -280,47 +324,80 @@ class TOCParser:
     def parse_from_file(self, file_path: str) -> Dict[str, Any]:
         """
         从文件解析目录
+        解析结果按(解析器类型, 路径, 修改时间)缓存，每次调用返回独立的副本
         """
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"文件不存在: {file_path}")
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
+        try:
+            mtime_ns = os.stat(file_path).st_mtime_ns
+        except FileNotFoundError:
+            raise FileNotFoundError(f"文件不存在: {file_path}") from None
+        
+        key = (type(self), os.path.abspath(file_path), mtime_ns)
+        result = _PARSE_CACHE.get(key)
+        if result is None:
+            # 直接把字节交给解析器，由其根据声明的编码解码
+            with open(file_path, 'rb') as f:
+                html_content = f.read()
+            result = self.parse_toc(html_content)
+            
+            # 超出容量时淘汰最早缓存的结果
+            if len(_PARSE_CACHE) >= PARSE_CACHE_SIZE:
+                del _PARSE_CACHE[next(iter(_PARSE_CACHE))]
+            _PARSE_CACHE[key] = result
         
-        return self.parse_toc(html_content)
+        # 返回副本，调用方修改结果不会影响缓存
+        return copy.deepcopy(result)
+    
+    @staticmethod
+    def _scan_dir(dir_path) -> Tuple[List[os.DirEntry], List[os.DirEntry]]:
+        """
+        单次遍历目录，返回按名称排序的HTML文件（不含index.html）和子目录
+        """
+        html_files = []
+        subdirs = []
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if not entry.name.startswith('.'):
+                        subdirs.append(entry)
+                elif entry.name.endswith('.html') and entry.name != 'index.html' and entry.is_file():
+                    html_files.append(entry)
+        html_files.sort(key=attrgetter('name'))
+        subdirs.sort(key=attrgetter('name'))
+        return html_files, subdirs
     
-    def scan_directory_structure(self, src_dir: str) -> Dict[str, Any]:
+    def scan_directory_structure(self, src_dir: str, include_sizes: bool = False) -> Dict[str, Any]:
         """
         扫描src文件夹的实际文件结构
-        返回目录结构和文件列表
+        返回目录结构和文件列表；仅在include_sizes为True时读取文件大小，否则size为None
+        各层级的文件和目录均已按名称排序，files中根目录文件排在最前
         """
-        src_path = Path(src_dir)
-        if not src_path.exists():
+        # 全程使用字符串路径和DirEntry，不为每个条目创建Path对象
+        src_dir = os.fspath(src_dir)
+        if not os.path.exists(src_dir):
             raise FileNotFoundError(f"src目录不存在: {src_dir}")
         
         structure = []
         files = []
         
         # 扫描根目录的HTML文件
-        root_html_files = [f for f in src_path.glob('*.html') if f.name != 'index.html']
+        root_html_files, root_subdirs = self._scan_dir(src_dir)
         
         for html_file in root_html_files:
-            relative_path = html_file.relative_to(src_path)
             files.append({
-                'path': str(relative_path),
+                'path': html_file.name,
                 'name': html_file.name,
-                'size': html_file.stat().st_size,
+                'size': html_file.stat().st_size if include_sizes else None,
                 'type': 'file',
                 'level': 0
             })
         
         # 扫描子目录，但忽略assets文件夹
-        subdirs = [d for d in src_path.iterdir() if d.is_dir() and not d.name.startswith('.') and d.name != 'assets']
+        subdirs = [d for d in root_subdirs if d.name != 'assets']
         
-        for subdir in sorted(subdirs):
+        for subdir in subdirs:
             dir_info = {
                 'name': subdir.name,
-                'path': str(subdir.relative_to(src_path)),
+                'path': subdir.name,
                 'type': 'directory',
                 'level': 0,
                 'files': [],
@@ -328,13 +405,12 @@ class TOCParser:
             }
             
             # 扫描子目录中的文件
-            dir_files = [f for f in subdir.glob('*.html') if f.name != 'index.html']
-            for file in sorted(dir_files):
-                relative_path = file.relative_to(src_path)
+            dir_files, sub_subdirs = self._scan_dir(subdir.path)
+            for file in dir_files:
                 file_info = {
-                    'path': str(relative_path),
+                    'path': os.path.join(subdir.name, file.name),
                     'name': file.name,
-                    'size': file.stat().st_size,
+                    'size': file.stat().st_size if include_sizes else None,
                     'type': 'file',
                     'level': 1
                 }
@@ -342,24 +418,23 @@ class TOCParser:
                 dir_info['files'].append(file_info)
             
             # 扫描子目录的子目录
-            sub_subdirs = [d for d in subdir.iterdir() if d.is_dir() and not d.name.startswith('.')]
-            for sub_subdir in sorted(sub_subdirs):
+            for sub_subdir in sub_subdirs:
+                sub_subdir_path = os.path.join(subdir.name, sub_subdir.name)
                 sub_subdir_info = {
                     'name': sub_subdir.name,
-                    'path': str(sub_subdir.relative_to(src_path)),
+                    'path': sub_subdir_path,
                     'type': 'directory',
                     'level': 1,
                     'files': []
                 }
                 
                 # 扫描子子目录中的文件
-                sub_subdir_files = [f for f in sub_subdir.glob('*.html') if f.name != 'index.html']
-                for file in sorted(sub_subdir_files):
-                    relative_path = file.relative_to(src_path)
+                sub_subdir_files, _ = self._scan_dir(sub_subdir.path)
+                for file in sub_subdir_files:
                     file_info = {
-                        'path': str(relative_path),
+                        'path': os.path.join(sub_subdir_path, file.name),
                         'name': file.name,
-                        'size': file.stat().st_size,
+                        'size': file.stat().st_size if include_sizes else None,
                         'type': 'file',
                         'level': 2
                     }
@@ -380,41 +455,44 @@ class TOCParser:
     def generate_file_structure_text(self, structure_data: Dict[str, Any]) -> str:
         """
         生成文件结构文本
+        文件和目录沿用scan_directory_structure返回的排序
         """
-        lines = []
-        lines.append("src/ 文件夹结构:")
-        lines.append("=" * 50)
-        lines.append("")
+        # 每行直接写入StringIO，不另外构建行列表再拼接
+        buf = io.StringIO()
+        w = buf.write
+        w("src/ 文件夹结构:\n")
+        w("=" * 50 + "\n")
+        w("\n")
         
         # 添加根目录文件
         root_files = [f for f in structure_data['files'] if f['level'] == 0]
         if root_files:
-            lines.append("根目录文件:")
-            for file in sorted(root_files, key=lambda x: x['name']):
-                lines.append(f"  📄 {file['name']}")
-            lines.append("")
+            w("根目录文件:\n")
+            for file in root_files:
+                w(f"  📄 {file['name']}\n")
+            w("\n")
         
         # 添加目录结构
-        for dir_info in sorted(structure_data['structure'], key=lambda x: x['name']):
-            lines.append(f"📁 {dir_info['name']}/")
+        for dir_info in structure_data['structure']:
+            w(f"📁 {dir_info['name']}/\n")
             
             # 添加目录中的文件
-            for file in sorted(dir_info['files'], key=lambda x: x['name']):
-                lines.append(f"    📄 {file['name']}")
+            for file in dir_info['files']:
+                w(f"    📄 {file['name']}\n")
             
             # 添加子目录
-            for sub_dir in sorted(dir_info['subdirs'], key=lambda x: x['name']):
-                lines.append(f"    📁 {sub_dir['name']}/")
-                for file in sorted(sub_dir['files'], key=lambda x: x['name']):
-                    lines.append(f"        📄 {file['name']}")
+            for sub_dir in dir_info['subdirs']:
+                w(f"    📁 {sub_dir['name']}/\n")
+                for file in sub_dir['files']:
+                    w(f"        📄 {file['name']}\n")
             
-            lines.append("")
+            w("\n")
         
         # 添加统计信息
-        lines.append("=" * 50)
-        lines.append(f"总计: {structure_data['total_files']} 个文件, {structure_data['total_dirs']} 个目录")
+        w("=" * 50 + "\n")
+        w(f"总计: {structure_data['total_files']} 个文件, {structure_data['total_dirs']} 个目录")
         
-        return '\n'.join(lines)
+        return buf.getvalue()
     
     def generate_file_structure_file(self, src_dir: str, output_file: str = 'output/file_structure.txt') -> str:
         """
@@ -429,9 +507,8 @@ class TOCParser:
         # 确保输出目录存在
         os.makedirs(os.path.dirname(output_file) if os.path.dirname(output_file) else '.', exist_ok=True)
         
-        # 写入文件
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(structure_text)
+        # 写入文件（UTF-8无BOM，保持\n换行，不做平台换行转换）
+        Path(output_file).write_bytes(structure_text.encode('utf-8'))
         
         return output_file
     
@@ -440,54 +517,75 @@ class TOCParser:
         验证目录结构与实际文件结构是否匹配
         返回验证结果，包括警告和错误信息
         """
+        # 主章节层级预先收集src下的子目录名，避免逐章节检查目录是否存在
+        # src目录不存在时与逐个检查子目录的行为一致：不产生任何警告
+        src_subdirs = {}
+        if level == 1 and os.path.isdir(src_dir):
+            _, subdir_entries = self._scan_dir(src_dir)
+            src_subdirs = {entry.name: entry.path for entry in subdir_entries}
+        
+        # 递归结果以(类别, 信息)的形式逐条产出，最后统一归类
         warnings = []
         errors = []
+        for kind, message in self._iter_structure_issues(hierarchical_toc, src_dir, src_subdirs, level):
+            (warnings if kind == 'warning' else errors).append(message)
         
-        src_path = Path(src_dir)
-        
+        return {
+            'warnings': warnings,
+            'errors': errors,
+            'total_warnings': len(warnings),
+            'total_errors': len(errors)
+        }
+    
+    def _iter_structure_issues(self, hierarchical_toc: List[Dict[str, Any]], src_dir: str, src_subdirs: Dict[str, str], level: int) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        递归检查目录结构，逐条产出('warning' | 'error', 信息)
+        """
         for item in hierarchical_toc:
             href = item['href']
-            file_path = src_path / href
             
             # 检查主章节对应的目录结构
             if level == 1:
                 base_name = Path(href).stem
-                expected_dir = src_path / base_name
+                expected_dir = src_subdirs.get(base_name)
+                if expected_dir is None:
+                    # 未命中时再按路径检查（如大小写不敏感的文件系统）
+                    candidate = os.path.join(src_dir, base_name)
+                    if os.path.isdir(candidate):
+                        expected_dir = candidate
                 
                 # 检查是否存在对应的子目录
-                if expected_dir.exists():
+                if expected_dir is not None:
                     # 检查HTML中的子章节数量与目录中的文件数量是否匹配
                     html_children = item.get('children', [])
                     
                     # 获取目录中的HTML文件
-                    if expected_dir.is_dir():
-                        dir_html_files = list(expected_dir.glob('*.html'))
-                        dir_html_files = [f for f in dir_html_files if f.name != 'index.html']
-                        
-                        if len(html_children) != len(dir_html_files):
-                            warning_msg = f"主章节 '{item['title']}' 的HTML子章节数量({len(html_children)})与目录中文件数量({len(dir_html_files)})不匹配"
-                            warnings.append({
-                                'type': 'mismatch_count',
-                                'chapter': item['title'],
-                                'html_count': len(html_children),
-                                'dir_count': len(dir_html_files),
-                                'message': warning_msg
-                            })
-                        
-                        # 检查是否有HTML中未包含的文件
-                        dir_file_names = set(f.name for f in dir_html_files)
-                        html_file_names = set(child['href'] for child in html_children)
-                        missing_in_html = dir_file_names - html_file_names
-                        
-                        if missing_in_html:
-                            warning_msg = f"目录 '{base_name}/' 中存在HTML未包含的文件: {', '.join(missing_in_html)}"
-                            warnings.append({
-                                'type': 'missing_in_html',
-                                'chapter': item['title'],
-                                'missing_files': list(missing_in_html),
-                                'message': warning_msg
-                            })
-                
+                    dir_html_files, _ = self._scan_dir(expected_dir)
+                    
+                    if len(html_children) != len(dir_html_files):
+                        warning_msg = f"主章节 '{item['title']}' 的HTML子章节数量({len(html_children)})与目录中文件数量({len(dir_html_files)})不匹配"
+                        yield 'warning', {
+                            'type': 'mismatch_count',
+                            'chapter': item['title'],
+                            'html_count': len(html_children),
+                            'dir_count': len(dir_html_files),
+                            'message': warning_msg
+                        }
+                    
+                    # 检查是否有HTML中未包含的文件
+                    dir_file_names = set(f.name for f in dir_html_files)
+                    html_file_names = set(child['href'] for child in html_children)
+                    missing_in_html = dir_file_names - html_file_names
+                    
+                    if missing_in_html:
+                        warning_msg = f"目录 '{base_name}/' 中存在HTML未包含的文件: {', '.join(missing_in_html)}"
+                        yield 'warning', {
+                            'type': 'missing_in_html',
+                            'chapter': item['title'],
+                            'missing_files': list(missing_in_html),
+                            'message': warning_msg
+                        }
+            
                 # 检查是否有子目录但没有在HTML中定义子章节
                 elif len(item.get('children', [])) > 0:
                     # HTML中有子章节，但对应的目录不存在
@@ -495,16 +593,26 @@ class TOCParser:
             
             # 递归检查子章节
             if item.get('children', []):
-                child_result = self.validate_directory_structure(item['children'], src_dir, level + 1)
-                warnings.extend(child_result['warnings'])
-                errors.extend(child_result['errors'])
-        
-        return {
-            'warnings': warnings,
-            'errors': errors,
-            'total_warnings': len(warnings),
-            'total_errors': len(errors)
-        }
+                yield from self._iter_structure_issues(item['children'], src_dir, src_subdirs, level + 1)
+
+
+@functools.lru_cache(maxsize=32)
+def _extract_title_cached(html_file_path: str, mtime_ns: int) -> str:
+    """
+    提取文档标题，按(路径, 修改时间)缓存
+    """
+    # 分块读取并流式解析，找到<title>后即停止，不读入整个文件
+    finder = _TitleFinder()
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    with open(html_file_path, 'rb') as f:
+        while not finder.done:
+            chunk = f.read(TITLE_READ_CHUNK)
+            finder.feed(decoder.decode(chunk, final=not chunk))
+            if not chunk:
+                finder.close()
+                break
+    
+    return finder.result()
 
 
 def main():
@@ -553,7 +661,7 @@ def main():
         # 输出解析结果摘要
         print('[INFO] 解析结果:')
         print(f'   总条目数: {result["total_items"]}')
-        print(f'   层级深度: {max(item["level"] for item in result["flat"])}')
+        print(f'   层级深度: {max(item.level for item in result["flat"])}')
         print(f'   有效文件: {validation["total_valid"]}')
         print(f'   缺失文件: {validation["total_missing"]}')
         print(f'   结构警告: {structure_validation["total_warnings"]}')
@@ -599,15 +707,15 @@ def main():
                     # 找到第一个主章节
                     first_chapter = None
                     for item in result['flat']:
-                        if '.' not in item['display_index']:
-                            first_chapter = item['display_index']
+                        if '.' not in item.display_index:
+                            first_chapter = item.display_index
                             break
                     
                     # 如果找到了第一个主章节，只保留该章节及其直接子章节
                     if first_chapter:
                         filtered_toc = [item for item in result['flat'] 
-                                      if (item['display_index'] == first_chapter or 
-                                          item['display_index'].startswith(first_chapter + '.'))]
+                                      if (item.display_index == first_chapter or 
+                                          item.display_index.startswith(first_chapter + '.'))]
                         toc_parser.generate_bookmarks_file(filtered_toc, doc_title, bookmarks_file, page_map)
                     else:
                         # 如果没有找到主章节，只保留前4个项目（第一个章节+3个子章节）